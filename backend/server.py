@@ -1,12 +1,25 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, Header
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Header, Query, Request
+from fastapi.responses import StreamingResponse, JSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.datastructures import Headers, MutableHeaders
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
+from pymongo.errors import CollectionInvalid, DuplicateKeyError, PyMongoError
 import os
+import asyncio
+import json
+import math
+import time
+import multiprocessing
+from collections import OrderedDict
+import numpy as np
+import gzip
+import brotli
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 import uuid
 from datetime import datetime, timezone, timedelta
 import jwt
@@ -36,6 +49,48 @@ JWT_ALG = "HS256"
 CSHARP_API_BASE = os.environ.get("CSHARP_API_BASE")  # e.g., https://your-csharp-service
 CSHARP_API_KEY = os.environ.get("CSHARP_API_KEY")
 
+# Worker processes (uvicorn --workers / WEB_CONCURRENCY); caches stay coherent via Mongo
+WEB_CONCURRENCY = int(os.environ.get("WEB_CONCURRENCY", "1"))
+# uvicorn --workers (or --reload) runs the app in a child process and gunicorn
+# sets SERVER_SOFTWARE, so this also catches workers started without WEB_CONCURRENCY
+MULTI_WORKER = (
+    WEB_CONCURRENCY > 1
+    or multiprocessing.parent_process() is not None
+    or os.environ.get("SERVER_SOFTWARE", "").startswith("gunicorn")
+)
+# Entries kept in the capped cross-worker change log (alumni writes)
+CACHE_CHANGES_MAX_DOCS = int(os.environ.get("CACHE_CHANGES_MAX_DOCS", "10000"))
+# How long a missing log entry may stay in flight before a full reload
+CACHE_GAP_GRACE_SECONDS = float(os.environ.get("CACHE_GAP_GRACE_SECONDS", "2"))
+# Minimum interval between cohort analytics checks for other workers' writes
+ANALYTICS_SYNC_INTERVAL_SECONDS = float(os.environ.get("ANALYTICS_SYNC_INTERVAL_SECONDS", "1"))
+
+# Live RSVP stream (SSE) configuration
+RSVP_STREAM_QUEUE_SIZE = int(os.environ.get("RSVP_STREAM_QUEUE_SIZE", "100"))
+RSVP_STREAM_HEARTBEAT_SECONDS = float(os.environ.get("RSVP_STREAM_HEARTBEAT_SECONDS", "15"))
+RSVP_STREAM_TICKET_SECONDS = int(os.environ.get("RSVP_STREAM_TICKET_SECONDS", "60"))
+# Open streams are advertised in Mongo for this long (renewed every heartbeat)
+RSVP_STREAM_LEASE_SECONDS = RSVP_STREAM_HEARTBEAT_SECONDS * 3
+# When "1", RSVP updates are fed from a Mongo change stream (requires a replica set)
+RSVP_CHANGE_STREAM = os.environ.get("RSVP_CHANGE_STREAM") == "1"
+# Otherwise, with several workers, RSVPs are fanned out through the change log
+RSVP_FEED_POLL_SECONDS = float(os.environ.get("RSVP_FEED_POLL_SECONDS", "0.5"))
+RSVP_FEED_GAP_GRACE_SECONDS = float(os.environ.get("RSVP_FEED_GAP_GRACE_SECONDS", "2"))
+# Entries kept in the capped RSVP feed (separate from the alumni change log)
+RSVP_FEED_MAX_DOCS = int(os.environ.get("RSVP_FEED_MAX_DOCS", "10000"))
+
+# Admission control for the public invitation endpoints
+# Number of trusted reverse proxies in front of the app that append to
+# X-Forwarded-For; 0 ignores the header (clients can put anything in it)
+TRUSTED_PROXY_HOPS = int(os.environ.get("TRUSTED_PROXY_HOPS", "0"))
+RATE_LIMIT_MAX_KEYS = int(os.environ.get("RATE_LIMIT_MAX_KEYS", "10000"))
+
+# Upper bound on ids accepted by the batch fetch endpoints
+BATCH_MAX_IDS = int(os.environ.get("BATCH_MAX_IDS", "100"))
+
+# Response compression: bodies smaller than this are sent as-is
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+
 # Utils for Mongo <-> Pydantic
 
 def iso_now() -> str:
@@ -56,6 +111,41 @@ def parse_from_mongo(item: dict) -> dict:
     item.pop("_id", None)  # Never expose ObjectId
     return item
 
+
+# In-flight batch lookups, keyed by (collection, ids) so concurrent identical
+# requests share a single $in query
+_inflight_batches: Dict[tuple, asyncio.Future] = {}
+
+async def _query_by_ids(collection: str, ids: tuple) -> Dict[str, dict]:
+    rows = await db[collection].find({"id": {"$in": list(ids)}}, {"_id": 0}).to_list(length=len(ids))
+    return {r["id"]: r for r in rows}
+
+async def fetch_by_ids(collection: str, ids: List[str]) -> Dict[str, dict]:
+    key = (collection, tuple(sorted(set(ids))))
+    task = _inflight_batches.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_query_by_ids(collection, key[1]))
+        _inflight_batches[key] = task
+        task.add_done_callback(lambda _: _inflight_batches.pop(key, None))
+    # Shield so one caller disconnecting does not cancel the shared query
+    return await asyncio.shield(task)
+
+def unique_ids(ids: List[str]) -> List[str]:
+    # Drop duplicates, keeping the first occurrence's position
+    return list(dict.fromkeys(ids))
+
+def field_projection(fields: Optional[str], model) -> Dict[str, int]:
+    # Mongo projection for a comma-separated `fields=` query param; id is always included
+    projection = {"_id": 0}
+    if not fields:
+        return projection
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [n for n in names if n not in model.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    projection.update({n: 1 for n in ["id", *names]})
+    return projection
+
 # Pydantic Models
 class StatusCheck(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -67,13 +157,14 @@ class StatusCheckCreate(BaseModel):
 
 class AlumniCreate(BaseModel):
     full_name: str
-    graduation_year: int
+    graduation_year: int = Field(..., ge=1900, le=2100)
     bacalaureat_passed: bool
     path: str  # "faculty" | "employed" | "other"
     email: Optional[EmailStr] = None
     phone: Optional[str] = None
 
 class Alumni(AlumniCreate):
+    graduation_year: int  # unbounded on read so older rows still load
     id: str
     created_at: str
 
@@ -87,6 +178,36 @@ class Event(EventCreate):
     id: str
     created_at: str
 
+# Row shapes for `fields=` projections: id plus whichever fields were requested
+class AlumniFields(BaseModel):
+    id: str
+    full_name: Optional[str] = None
+    graduation_year: Optional[int] = None
+    bacalaureat_passed: Optional[bool] = None
+    path: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    created_at: Optional[str] = None
+
+class EventFields(BaseModel):
+    id: str
+    title: Optional[str] = None
+    date: Optional[str] = None
+    location: Optional[str] = None
+    description: Optional[str] = None
+    created_at: Optional[str] = None
+
+class BatchIdsRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=BATCH_MAX_IDS)
+
+class AlumniBatchResponse(BaseModel):
+    items: List[Alumni]
+    missing: List[str]
+
+class EventBatchResponse(BaseModel):
+    items: List[Event]
+    missing: List[str]
+
 class InvitationCreate(BaseModel):
     event_id: str
 
@@ -119,18 +240,56 @@ class CsRenderResponse(BaseModel):
     pdf_base64: str
     meta: Optional[Dict[str, Any]] = None
 
+# Startup (safe to run concurrently from several workers)
+async def ensure_indexes():
+    for log, max_docs in (("cache_changes", CACHE_CHANGES_MAX_DOCS), ("rsvp_feed", RSVP_FEED_MAX_DOCS)):
+        try:
+            await db.create_collection(log, capped=True, size=max_docs * 1024, max=max_docs)
+        except CollectionInvalid:
+            pass  # already created (possibly by another worker)
+        except PyMongoError as e:
+            logger.warning("Could not create %s log: %s", log, e)
+    specs = [
+        ("users", "username", True),
+        ("alumni", "id", True),
+        ("alumni", "created_at", False),
+        ("events", "id", True),
+        ("events", "created_at", False),
+        ("invitations", "token", True),
+        ("invitations", "event_id", False),
+        ("cache_changes", [("cache", 1), ("gen", 1)], False),
+        ("rsvp_feed", [("cache", 1), ("gen", 1)], False),
+        ("rsvp_streams", "event_id", False),
+    ]
+    for collection, key, unique in specs:
+        try:
+            await db[collection].create_index(key, unique=unique)
+        except PyMongoError as e:
+            # e.g. pre-existing duplicates; keep serving without the index
+            logger.warning("Could not create index %s %s: %s", collection, key, e)
+    try:
+        # Leases of streams whose worker died without releasing them
+        await db.rsvp_streams.create_index("expires_at", expireAfterSeconds=0)
+    except PyMongoError as e:
+        logger.warning("Could not create index rsvp_streams expires_at: %s", e)
+
 # Auth helpers
 async def ensure_admin_seed():
-    # Seed a default admin user if not present
-    existing = await db.users.find_one({"username": "admin"})
-    if not existing:
-        hashed = pwd_context.hash("admin123")
-        await db.users.insert_one({
-            "id": str(uuid.uuid4()),
-            "username": "admin",
-            "password_hash": hashed,
-            "created_at": iso_now(),
-        })
+    # Seed a default admin user if not present; the upsert is atomic, so
+    # workers starting together cannot create duplicates
+    try:
+        await db.users.update_one(
+            {"username": "admin"},
+            {"$setOnInsert": {
+                "id": str(uuid.uuid4()),
+                "username": "admin",
+                "password_hash": pwd_context.hash("admin123"),
+                "created_at": iso_now(),
+            }},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        pass  # another worker won the race
 
 async def get_current_user(authorization: Optional[str] = Header(None)) -> Optional[str]:
     if not authorization:
@@ -140,10 +299,633 @@ async def get_current_user(authorization: Optional[str] = Header(None)) -> Optio
         if scheme.lower() != "bearer":
             raise ValueError("Invalid scheme")
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALG])
+        if payload.get("scope"):
+            raise ValueError("Scoped tickets are not session tokens")
         return payload.get("sub")
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
+def issue_stream_ticket(username: str, event_id: str) -> str:
+    exp = datetime.now(timezone.utc) + timedelta(seconds=RSVP_STREAM_TICKET_SECONDS)
+    return jwt.encode(
+        {"sub": username, "scope": f"rsvp_stream:{event_id}", "exp": exp},
+        JWT_SECRET,
+        algorithm=JWT_ALG,
+    )
+
+async def get_stream_ticket_user(event_id: str, ticket: Optional[str] = Query(None)) -> Optional[str]:
+    # EventSource cannot set headers, so the stream takes a short-lived ticket
+    # scoped to one event instead of the admin JWT (which would end up in logs)
+    if not ticket:
+        raise HTTPException(status_code=401, detail="Missing stream ticket")
+    try:
+        payload = jwt.decode(ticket, JWT_SECRET, algorithms=[JWT_ALG])
+    except Exception:
+        raise HTTPException(status_code=401, detail="Invalid or expired ticket")
+    if payload.get("scope") != f"rsvp_stream:{event_id}":
+        raise HTTPException(status_code=401, detail="Invalid or expired ticket")
+    return payload.get("sub")
+
+# Admission control
+class TokenBucket:
+    """Per-key token buckets; `rate` tokens/second refill up to `burst`.
+
+    Keys are kept in LRU order and capped at `max_keys` so a flood of
+    distinct IPs or tokens cannot grow memory without bound.
+    """
+
+    def __init__(self, rate: float, burst: float, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def _tokens(self, key: str, now: float) -> float:
+        tokens, last = self._buckets.get(key, (self.burst, now))
+        return min(self.burst, tokens + (now - last) * self.rate)
+
+    def peek(self, key: str) -> float:
+        # Returns 0 if a token is available, otherwise the seconds until one is;
+        # does not consume or track the key
+        tokens = self._tokens(key, time.monotonic())
+        return 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+
+    def take(self, key: str) -> None:
+        # Consume one token; call only after peek() admitted the request
+        now = time.monotonic()
+        tokens = self._tokens(key, now)
+        self._buckets.pop(key, None)
+        self._buckets[key] = (max(0.0, tokens - 1), now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.environ.get(name, default))
+
+
+def client_ip(request: Request) -> str:
+    # With N trusted proxies the last N X-Forwarded-For entries were appended by
+    # them; the entry N from the right is the address the outermost one saw
+    if TRUSTED_PROXY_HOPS > 0:
+        hops = [h.strip() for h in request.headers.get("x-forwarded-for", "").split(",") if h.strip()]
+        if len(hops) >= TRUSTED_PROXY_HOPS:
+            return hops[-TRUSTED_PROXY_HOPS]
+    return request.client.host if request.client else "unknown"
+
+
+class RouteLimiter:
+    """Concurrency cap plus per-IP and per-token rate limits for one route.
+
+    Used as a FastAPI dependency on routes with a `token` path parameter.
+    Requests over a limit are rejected immediately (429 for rate, 503 for
+    concurrency) with Retry-After instead of queueing. A limit of 0
+    disables that check. State lives in the worker process, so with N
+    workers the effective limits are up to N times the configured ones.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, ip_rate: float, ip_burst: float,
+                 token_rate: float, token_burst: float):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.by_ip = TokenBucket(ip_rate, ip_burst) if ip_rate > 0 else None
+        self.by_token = TokenBucket(token_rate, token_burst) if token_rate > 0 else None
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = {"concurrency": 0, "ip_rate": 0, "token_rate": 0}
+
+    @classmethod
+    def from_env(cls, name: str, prefix: str, max_concurrency: int, ip_rate: float, ip_burst: float,
+                 token_rate: float, token_burst: float) -> "RouteLimiter":
+        return cls(
+            name,
+            max_concurrency=int(_env_float(f"{prefix}_MAX_CONCURRENCY", max_concurrency)),
+            ip_rate=_env_float(f"{prefix}_IP_RATE", ip_rate),
+            ip_burst=_env_float(f"{prefix}_IP_BURST", ip_burst),
+            token_rate=_env_float(f"{prefix}_TOKEN_RATE", token_rate),
+            token_burst=_env_float(f"{prefix}_TOKEN_BURST", token_burst),
+        )
+
+    def _reject(self, reason: str, status_code: int, retry_after: float):
+        self.rejected[reason] += 1
+        raise HTTPException(
+            status_code=status_code,
+            detail="Too many requests" if status_code == 429 else "Server busy, retry shortly",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+    async def __call__(self, request: Request, token: str):
+        # Check everything before charging anything, so a rejected request
+        # does not eat into the caller's budget
+        if self.max_concurrency and self.in_flight >= self.max_concurrency:
+            self._reject("concurrency", 503, 1)
+        ip = client_ip(request)
+        if self.by_ip is not None:
+            wait = self.by_ip.peek(ip)
+            if wait:
+                self._reject("ip_rate", 429, wait)
+        if self.by_token is not None:
+            wait = self.by_token.peek(token)
+            if wait:
+                self._reject("token_rate", 429, wait)
+        if self.by_ip is not None:
+            self.by_ip.take(ip)
+        if self.by_token is not None:
+            self.by_token.take(token)
+        self.in_flight += 1
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "tracked_ips": len(self.by_ip) if self.by_ip is not None else 0,
+            "tracked_tokens": len(self.by_token) if self.by_token is not None else 0,
+        }
+
+
+# Without trusted proxies every request behind an ingress shares the proxy's
+# address, so per-IP limits are off by default (INVITE_*_IP_RATE overrides)
+_proxied = TRUSTED_PROXY_HOPS > 0
+invitation_get_limiter = RouteLimiter.from_env(
+    "invitation_get", "INVITE_GET",
+    max_concurrency=64, ip_rate=5 if _proxied else 0, ip_burst=20, token_rate=2, token_burst=10,
+)
+invitation_rsvp_limiter = RouteLimiter.from_env(
+    "invitation_rsvp", "INVITE_RSVP",
+    max_concurrency=32, ip_rate=1 if _proxied else 0, ip_burst=5, token_rate=0.2, token_burst=3,
+)
+route_limiters = [invitation_get_limiter, invitation_rsvp_limiter]
+
+# Cross-worker cache coherence
+class CacheGeneration:
+    """Counter in Mongo bumped after every write to a cached collection.
+
+    Each bump also appends an entry (changed ids, or a message) to a capped
+    log collection, so a worker that falls behind can replay just the
+    entries it missed. A gap in the log is either a bump whose entry has not
+    been inserted yet ("pending") or entries that aged out ("lost").
+    """
+
+    def __init__(self, name: str, log: str, max_docs: int):
+        self.name = name
+        self.log = log
+        self.max_docs = max_docs
+
+    async def current(self) -> int:
+        doc = await db.cache_generations.find_one({"_id": self.name})
+        return doc["gen"] if doc else 0
+
+    async def bump(self, entry: dict) -> int:
+        doc = await db.cache_generations.find_one_and_update(
+            {"_id": self.name},
+            {"$inc": {"gen": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        await db[self.log].insert_one({"cache": self.name, "gen": doc["gen"], **entry})
+        return doc["gen"]
+
+    async def entries(self, since: int, until: int) -> tuple:
+        """Return (run, status, resume) for the log after `since`, up to `until`.
+
+        `run` is the unbroken sequence of entries starting at since + 1 (at
+        most `max_docs` of them). `status` is "complete" when the run reaches
+        `until`, "lost" when the next entry has aged out of the log, and
+        "pending" otherwise (still being inserted, or the run was truncated).
+        A reader giving up on the gap can continue after `resume`.
+        """
+        if until <= since:
+            return [], "complete", since
+        rows = await db[self.log].find(
+            {"cache": self.name, "gen": {"$gt": since, "$lte": until}}, {"_id": 0},
+        ).sort("gen", 1).to_list(length=min(until - since, self.max_docs))
+        run = []
+        for row in rows:
+            if row["gen"] != since + len(run) + 1:
+                break
+            run.append(row)
+        missing = since + len(run) + 1
+        if missing > until:
+            return run, "complete", until
+        oldest = await db[self.log].find_one({"cache": self.name}, {"_id": 0, "gen": 1}, sort=[("gen", 1)])
+        if oldest and oldest["gen"] > missing:
+            return run, "lost", oldest["gen"] - 1
+        return run, "pending", missing
+
+alumni_generation = CacheGeneration("alumni", "cache_changes", CACHE_CHANGES_MAX_DOCS)
+rsvp_generation = CacheGeneration("rsvp", "rsvp_feed", RSVP_FEED_MAX_DOCS)
+
+# Cohort analytics snapshot
+YEAR_LOOKUP_MAX_SPAN = 4096
+
+class AlumniSnapshot:
+    """Columnar in-memory projection of alumni for cohort analytics.
+
+    Loaded once from Mongo, then kept current by the alumni write routes:
+    upsert/remove touch a single row instead of reloading. Deleted rows are
+    masked out and their slots reused. Results are memoized per version.
+    Writes from other workers are replayed from the `alumni_generation`
+    change log by re-fetching only the changed rows, at most once every
+    ANALYTICS_SYNC_INTERVAL_SECONDS.
+    """
+
+    COLUMNS = {"_id": 0, "id": 1, "graduation_year": 1, "path": 1, "bacalaureat_passed": 1}
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._generation = 0
+        self._loading = False
+        self._pending: List[tuple] = []
+        self.loaded = False
+        self.db_generation = 0
+        self._checked_at = 0.0
+        self._gap_since: Optional[float] = None
+        self._clear()
+
+    def _clear(self):
+        self._rows: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._size = 0
+        self.years = np.zeros(0, dtype=np.int64)
+        self.paths = np.zeros(0, dtype=np.int16)
+        self.bac = np.zeros(0, dtype=bool)
+        self.alive = np.zeros(0, dtype=bool)
+        self.path_names: List[str] = []
+        self._path_codes: Dict[str, int] = {}
+        self.version = 0
+        self._result: Optional[dict] = None
+        self._result_version = -1
+
+    def invalidate(self):
+        # Force a full reload on next use
+        self._generation += 1
+        self.loaded = False
+
+    async def sync(self):
+        # Catch up with writes made by any worker since this snapshot was built
+        now = time.monotonic()
+        if self.loaded and now - self._checked_at >= ANALYTICS_SYNC_INTERVAL_SECONDS:
+            self._checked_at = now
+            generation = await alumni_generation.current()
+            if generation != self.db_generation:
+                await self._catch_up(generation)
+        await self.ensure_loaded()
+
+    async def _catch_up(self, generation: int):
+        async with self._lock:
+            if not self.loaded or generation == self.db_generation:
+                return
+            if generation < self.db_generation:
+                self.invalidate()  # counter was reset
+                return
+            run, status, _ = await alumni_generation.entries(self.db_generation, generation)
+            ids = {i for e in run for i in e.get("ids", [])}
+            if ids:
+                rows = await db.alumni.find({"id": {"$in": list(ids)}}, self.COLUMNS).to_list(length=len(ids))
+                for row in rows:
+                    self.upsert(row)
+                for alumni_id in ids - {r["id"] for r in rows}:
+                    self.remove(alumni_id)
+            if run:
+                self.db_generation = run[-1]["gen"]
+            if status == "complete":
+                self._gap_since = None
+            elif status == "lost":
+                logger.warning("Alumni change log missing entries after %d; reloading analytics", self.db_generation)
+                self.invalidate()
+            elif run or self._gap_since is None:
+                # A bump whose entry is still being inserted; retry on a later sync
+                self._gap_since = time.monotonic()
+                self._checked_at = 0.0
+            elif time.monotonic() - self._gap_since >= CACHE_GAP_GRACE_SECONDS:
+                logger.warning("Alumni change log entry %d never arrived; reloading analytics", self.db_generation + 1)
+                self.invalidate()
+            else:
+                self._checked_at = 0.0
+
+    async def record_write(self, alumni_id: str):
+        # Call after applying a local write. Our own entry is replayed like
+        # any other by the next sync(); re-applying a row is idempotent
+        await alumni_generation.bump({"ids": [alumni_id]})
+
+    async def ensure_loaded(self):
+        if self.loaded:
+            return
+        async with self._lock:
+            while not self.loaded:
+                generation = self._generation
+                self._clear()
+                self._loading = True
+                try:
+                    # Read before the cursor so concurrent writes can only make us stale, never miss
+                    self.db_generation = await alumni_generation.current()
+                    self._checked_at = time.monotonic()
+                    self._gap_since = None
+                    async for row in db.alumni.find({}, self.COLUMNS, batch_size=10000):
+                        try:
+                            self._apply(row)
+                        except (TypeError, ValueError, OverflowError) as e:
+                            logger.warning("Skipping alumnus %s in cohort snapshot: %s", row.get("id"), e)
+                    # Replay writes that landed while the cursor was open
+                    for op, arg in self._pending:
+                        if op == "upsert":
+                            try:
+                                self._apply(arg)
+                            except (TypeError, ValueError, OverflowError) as e:
+                                logger.warning("Skipping alumnus %s in cohort snapshot: %s", arg.get("id"), e)
+                        else:
+                            self._remove(arg)
+                finally:
+                    self._loading = False
+                    self._pending = []
+                self.loaded = generation == self._generation
+
+    def upsert(self, doc: dict):
+        # Called after the Mongo write succeeded, so it must never raise
+        if self._loading:
+            self._pending.append(("upsert", doc))
+        elif self.loaded:
+            try:
+                self._apply(doc)
+            except Exception as e:
+                logger.warning("Cohort snapshot update failed, reloading: %s", e)
+                self.invalidate()
+
+    def remove(self, alumni_id: str):
+        if self._loading:
+            self._pending.append(("remove", alumni_id))
+        elif self.loaded:
+            self._remove(alumni_id)
+
+    def _path_code(self, path: str) -> int:
+        code = self._path_codes.get(path)
+        if code is None:
+            code = self._path_codes[path] = len(self.path_names)
+            self.path_names.append(path)
+        return code
+
+    def _new_row(self) -> int:
+        if self._free:
+            return self._free.pop()
+        if self._size == len(self.years):
+            capacity = max(1024, 2 * len(self.years))
+            for name in ("years", "paths", "bac", "alive"):
+                old = getattr(self, name)
+                grown = np.zeros(capacity, dtype=old.dtype)
+                grown[:len(old)] = old
+                setattr(self, name, grown)
+        self._size += 1
+        return self._size - 1
+
+    def _apply(self, doc: dict):
+        row = self._rows.get(doc["id"])
+        if row is None:
+            row = self._rows[doc["id"]] = self._new_row()
+        self.years[row] = int(doc.get("graduation_year") or 0)
+        self.paths[row] = self._path_code(doc.get("path") or "other")
+        self.bac[row] = bool(doc.get("bacalaureat_passed"))
+        self.alive[row] = True
+        self.version += 1
+
+    def _remove(self, alumni_id: str):
+        row = self._rows.pop(alumni_id, None)
+        if row is not None:
+            self.alive[row] = False
+            self._free.append(row)
+            self.version += 1
+
+    def cohorts(self) -> dict:
+        if self._result_version == self.version:
+            return self._result
+        mask = self.alive[:self._size]
+        years = self.years[:self._size][mask]
+        paths = self.paths[:self._size][mask]
+        bac = self.bac[:self._size][mask]
+        result = {"total": int(years.size), "years": [], "paths": [], "by_year_path": {},
+                  "bac_pass_rate": {}, "yoy_delta": {}}
+        if years.size:
+            # Factorize years so the crosstab is sized by distinct years, not by
+            # the year range (one outlier must not allocate gigabytes). Narrow
+            # ranges use an O(n) lookup table; wide ones fall back to a sort.
+            first_year = int(years.min())
+            span = int(years.max()) - first_year + 1
+            if span <= YEAR_LOOKUP_MAX_SPAN:
+                present = np.bincount(years - first_year, minlength=span) > 0
+                year_values = np.flatnonzero(present) + first_year
+                year_idx = (np.cumsum(present) - 1)[years - first_year]
+            else:
+                year_values, year_idx = np.unique(years, return_inverse=True)
+            n_years = len(year_values)
+            n_paths = len(self.path_names)
+            counts = np.bincount(year_idx * n_paths + paths, minlength=n_years * n_paths).reshape(n_years, n_paths)
+            passed = np.bincount(year_idx, weights=bac, minlength=n_years)
+            totals = counts.sum(axis=1)
+            path_cols = np.flatnonzero(counts.sum(axis=0))
+            counts = counts[:, path_cols]
+            pass_rate = passed / totals
+            year_keys = [str(y) for y in year_values.tolist()]
+            path_names = [self.path_names[p] for p in path_cols]
+            result["years"] = [int(y) for y in year_keys]
+            result["paths"] = path_names
+            result["by_year_path"] = {
+                y: dict(zip(path_names, row)) for y, row in zip(year_keys, counts.tolist())
+            }
+            result["bac_pass_rate"] = dict(zip(year_keys, np.round(pass_rate, 4).tolist()))
+            # Deltas against the previous year that has alumni
+            d_total = np.diff(totals).tolist()
+            d_rate = np.round(np.diff(pass_rate), 4).tolist()
+            d_paths = np.diff(counts, axis=0).tolist()
+            result["yoy_delta"] = {
+                y: {"total": d_total[i], "bac_pass_rate": d_rate[i], "by_path": dict(zip(path_names, d_paths[i]))}
+                for i, y in enumerate(year_keys[1:])
+            }
+        self._result = result
+        self._result_version = self.version
+        return result
+
+alumni_snapshot = AlumniSnapshot()
+
+# Live RSVP fan-out
+class RsvpBroker:
+    """In-process pub/sub for RSVP changes, keyed by event id.
+
+    Each subscriber owns a bounded queue. A publish never blocks: when a
+    subscriber falls behind, its oldest pending message is dropped so the
+    write path stays O(subscribers) regardless of slow readers.
+    """
+
+    def __init__(self, queue_size: int = RSVP_STREAM_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, set] = {}
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, event_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(event_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, event_id: str, queue: asyncio.Queue) -> None:
+        subs = self._subscribers.get(event_id)
+        if not subs:
+            return
+        subs.discard(queue)
+        if not subs:
+            self._subscribers.pop(event_id, None)
+
+    def publish(self, event_id: str, message: dict) -> int:
+        subs = self._subscribers.get(event_id)
+        if not subs:
+            return 0
+        self.published += 1
+        for queue in subs:
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(message)
+        return len(subs)
+
+    def subscriber_count(self, event_id: Optional[str] = None) -> int:
+        if event_id is not None:
+            return len(self._subscribers.get(event_id, ()))
+        return sum(len(s) for s in self._subscribers.values())
+
+rsvp_broker = RsvpBroker()
+
+def rsvp_message(inv: dict) -> dict:
+    # Only what the dashboard needs; the invitation token stays private
+    return {
+        "invitation_id": inv.get("id"),
+        "event_id": inv.get("event_id"),
+        "rsvp_status": inv.get("rsvp_status"),
+        "rsvp_at": inv.get("rsvp_at"),
+    }
+
+class RsvpStreamLease:
+    """Advertises an open RSVP stream in Mongo (multi-worker feed mode only).
+
+    publish_rsvp skips the feed write for events nobody is watching. The
+    lease is renewed at most once per heartbeat and expires on its own
+    (TTL index) if the worker dies before releasing it.
+    """
+
+    def __init__(self, event_id: str):
+        self.event_id = event_id
+        self.id = str(uuid.uuid4())
+        self.renewed_at: Optional[float] = None
+
+    @staticmethod
+    def enabled() -> bool:
+        return MULTI_WORKER and not RSVP_CHANGE_STREAM
+
+    async def renew(self):
+        now = time.monotonic()
+        if not self.enabled() or (self.renewed_at is not None and now - self.renewed_at < RSVP_STREAM_HEARTBEAT_SECONDS):
+            return
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=RSVP_STREAM_LEASE_SECONDS)
+        try:
+            await db.rsvp_streams.update_one(
+                {"_id": self.id}, {"$set": {"event_id": self.event_id, "expires_at": expires_at}}, upsert=True,
+            )
+            self.renewed_at = now
+        except PyMongoError as e:
+            logger.warning("Could not renew RSVP stream lease for event %s: %s", self.event_id, e)
+
+    async def release(self):
+        if not self.enabled() or self.renewed_at is None:
+            return
+        try:
+            await db.rsvp_streams.delete_one({"_id": self.id})
+        except PyMongoError as e:
+            logger.warning("Could not release RSVP stream lease for event %s: %s", self.event_id, e)
+
+async def has_rsvp_streams(event_id: str) -> bool:
+    lease = await db.rsvp_streams.find_one(
+        {"event_id": event_id, "expires_at": {"$gt": datetime.now(timezone.utc)}}, {"_id": 1},
+    )
+    return lease is not None
+
+async def publish_rsvp(inv: dict):
+    message = rsvp_message(inv)
+    if RSVP_CHANGE_STREAM:
+        return  # the change stream watcher publishes it
+    if MULTI_WORKER:
+        # Every worker (this one included) picks it up in poll_rsvp_feed;
+        # nothing to write when no worker has a stream open for the event
+        if await has_rsvp_streams(message["event_id"]):
+            await rsvp_generation.bump({"message": message})
+    else:
+        rsvp_broker.publish(message["event_id"], message)
+
+async def poll_rsvp_feed():
+    # Multi-worker fan-out without a replica set: poll the change log while
+    # this worker has stream subscribers
+    last = None
+    gap_since = None
+    while True:
+        await asyncio.sleep(RSVP_FEED_POLL_SECONDS)
+        if not rsvp_broker.subscriber_count():
+            last = None
+            continue
+        try:
+            generation = await rsvp_generation.current()
+            if last is None or generation < last:
+                last = generation
+                continue
+            if generation == last:
+                continue
+            run, status, resume = await rsvp_generation.entries(last, generation)
+            for entry in run:
+                message = entry.get("message") or {}
+                rsvp_broker.publish(message.get("event_id"), message)
+            if run:
+                last = run[-1]["gen"]
+            if status == "complete":
+                gap_since = None
+            elif status == "lost":
+                logger.warning("RSVP feed skipped %d expired entries", resume - last)
+                last, gap_since = resume, None
+            elif run or gap_since is None:
+                # A bump whose entry is still being inserted shows up as a gap;
+                # give it a moment before skipping past
+                gap_since = time.monotonic()
+            elif time.monotonic() - gap_since >= RSVP_FEED_GAP_GRACE_SECONDS:
+                logger.warning("RSVP feed skipped missing entry %d", resume)
+                last, gap_since = resume, None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("RSVP feed poll failed: %s", e)
+
+async def watch_rsvp_changes():
+    # Feed the broker from a Mongo change stream (replica set only)
+    pipeline = [{"$match": {
+        "operationType": "update",
+        "updateDescription.updatedFields.rsvp_status": {"$exists": True},
+    }}]
+    while True:
+        try:
+            async with db.invitations.watch(pipeline, full_document="updateLookup") as stream:
+                async for change in stream:
+                    inv = change.get("fullDocument")
+                    if inv:
+                        rsvp_broker.publish(inv.get("event_id"), rsvp_message(inv))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("RSVP change stream failed, retrying: %s", e)
+            await asyncio.sleep(5)
+
 # Routes
 @api_router.get("/")
 async def root():
@@ -179,13 +961,28 @@ async def create_alumni(payload: AlumniCreate, _: str = Depends(get_current_user
         **payload.model_dump(),
     )
     await db.alumni.insert_one(prepare_for_mongo(new_obj.model_dump()))
+    alumni_snapshot.upsert(new_obj.model_dump())
+    await alumni_snapshot.record_write(new_obj.id)
     return new_obj
 
-@api_router.get("/alumni", response_model=List[Alumni])
-async def list_alumni():
-    rows = await db.alumni.find().sort("created_at", -1).to_list(length=1000)
+@api_router.get("/alumni", response_model=Union[List[Alumni], List[AlumniFields]])
+async def list_alumni(fields: Optional[str] = None):
+    rows = await db.alumni.find({}, field_projection(fields, Alumni)).sort("created_at", -1).to_list(length=1000)
+    if fields:
+        # Rows are already in AlumniFields shape; skip re-validation so
+        # unrequested fields are left out rather than sent as null
+        return JSONResponse(rows)
     return [Alumni(**parse_from_mongo(r)) for r in rows]
 
+@api_router.post("/alumni/batch", response_model=AlumniBatchResponse)
+async def get_alumni_batch(data: BatchIdsRequest):
+    ids = unique_ids(data.ids)
+    found = await fetch_by_ids("alumni", ids)
+    return AlumniBatchResponse(
+        items=[Alumni(**found[i]) for i in ids if i in found],
+        missing=[i for i in ids if i not in found],
+    )
+
 @api_router.get("/alumni/{alumni_id}", response_model=Alumni)
 async def get_alumni(alumni_id: str):
     row = await db.alumni.find_one({"id": alumni_id})
@@ -204,11 +1001,15 @@ async def update_alumni(alumni_id: str, payload: AlumniCreate, _: str = Depends(
     }
     await db.alumni.update_one({"id": alumni_id}, {"$set": updated})
     updated = await db.alumni.find_one({"id": alumni_id})
+    alumni_snapshot.upsert(updated)
+    await alumni_snapshot.record_write(alumni_id)
     return Alumni(**parse_from_mongo(updated))
 
 @api_router.delete("/alumni/{alumni_id}")
 async def delete_alumni(alumni_id: str, _: str = Depends(get_current_user)):
     await db.alumni.delete_one({"id": alumni_id})
+    alumni_snapshot.remove(alumni_id)
+    await alumni_snapshot.record_write(alumni_id)
     return {"ok": True}
 
 # Events CRUD
@@ -218,11 +1019,22 @@ async def create_event(payload: EventCreate, _: str = Depends(get_current_user))
     await db.events.insert_one(prepare_for_mongo(evt.model_dump()))
     return evt
 
-@api_router.get("/events", response_model=List[Event])
-async def list_events():
-    rows = await db.events.find().sort("created_at", -1).to_list(length=1000)
+@api_router.get("/events", response_model=Union[List[Event], List[EventFields]])
+async def list_events(fields: Optional[str] = None):
+    rows = await db.events.find({}, field_projection(fields, Event)).sort("created_at", -1).to_list(length=1000)
+    if fields:
+        return JSONResponse(rows)
     return [Event(**parse_from_mongo(r)) for r in rows]
 
+@api_router.post("/events/batch", response_model=EventBatchResponse)
+async def get_events_batch(data: BatchIdsRequest):
+    ids = unique_ids(data.ids)
+    found = await fetch_by_ids("events", ids)
+    return EventBatchResponse(
+        items=[Event(**found[i]) for i in ids if i in found],
+        missing=[i for i in ids if i not in found],
+    )
+
 @api_router.get("/events/{event_id}", response_model=Event)
 async def get_event(event_id: str):
     row = await db.events.find_one({"id": event_id})
@@ -246,7 +1058,7 @@ async def create_invitation(data: InvitationCreate, _: str = Depends(get_current
     await db.invitations.insert_one(inv.model_dump())
     return inv
 
-@api_router.get("/invitations/{token}")
+@api_router.get("/invitations/{token}", dependencies=[Depends(invitation_get_limiter)])
 async def get_invitation_by_token(token: str):
     inv = await db.invitations.find_one({"token": token})
     if not inv:
@@ -259,7 +1071,7 @@ async def get_invitation_by_token(token: str):
         "event": parse_from_mongo(ev),
     }
 
-@api_router.post("/invitations/{token}/rsvp")
+@api_router.post("/invitations/{token}/rsvp", dependencies=[Depends(invitation_rsvp_limiter)])
 async def rsvp_invitation(token: str, req: RSVPRequest):
     if req.status not in ("yes", "no"):
         raise HTTPException(status_code=400, detail="Invalid RSVP status")
@@ -268,12 +1080,64 @@ async def rsvp_invitation(token: str, req: RSVPRequest):
         raise HTTPException(status_code=404, detail="Invitation not found")
     await db.invitations.update_one({"token": token}, {"$set": {"rsvp_status": req.status, "rsvp_at": iso_now()}})
     inv = await db.invitations.find_one({"token": token})
+    try:
+        await publish_rsvp(inv)
+    except PyMongoError as e:
+        # The RSVP is saved; open streams just miss this update
+        logger.warning("Could not publish RSVP for invitation %s: %s", inv.get("id"), e)
     ev = await db.events.find_one({"id": inv.get("event_id")})
     return {
         "invitation": parse_from_mongo(inv),
         "event": parse_from_mongo(ev) if ev else None,
     }
 
+@api_router.post("/events/{event_id}/rsvps/stream-ticket")
+async def create_rsvp_stream_ticket(event_id: str, username: str = Depends(get_current_user)):
+    ev = await db.events.find_one({"id": event_id}, {"_id": 0, "id": 1})
+    if not ev:
+        raise HTTPException(status_code=404, detail="Event not found")
+    return {"ticket": issue_stream_ticket(username, event_id), "expires_in": RSVP_STREAM_TICKET_SECONDS}
+
+@api_router.get("/events/{event_id}/rsvps/stream")
+async def stream_event_rsvps(event_id: str, _: str = Depends(get_stream_ticket_user)):
+    ev = await db.events.find_one({"id": event_id}, {"_id": 0, "id": 1})
+    if not ev:
+        raise HTTPException(status_code=404, detail="Event not found")
+    queue = rsvp_broker.subscribe(event_id)
+    lease = RsvpStreamLease(event_id)
+
+    async def event_source():
+        try:
+            await lease.renew()
+            yield f"retry: {int(RSVP_STREAM_HEARTBEAT_SECONDS * 1000)}\n\n"
+            while True:
+                try:
+                    msg = await asyncio.wait_for(queue.get(), timeout=RSVP_STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    await lease.renew()
+                    yield ": heartbeat\n\n"
+                    continue
+                await lease.renew()
+                yield f"event: rsvp\ndata: {json.dumps(msg)}\n\n"
+        finally:
+            rsvp_broker.unsubscribe(event_id, queue)
+            # Shielded: a client disconnect cancels this generator
+            await asyncio.shield(lease.release())
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@api_router.get("/admin/limits")
+async def get_admission_stats(_: str = Depends(get_current_user)):
+    # Limits and counters are per worker process; this reports whichever one answered
+    return {
+        "worker_pid": os.getpid(),
+        **{limiter.name: limiter.stats() for limiter in route_limiters},
+    }
+
 # =============== C# Integration Proxy Endpoints ===============
 @api_router.post("/csharp/invitations/render", response_model=CsRenderResponse)
 async def cs_render_invitation(payload: CsRenderRequest, _: str = Depends(get_current_user)):
@@ -343,6 +1207,88 @@ async def cs_alumni_metrics():
             bac["failed"] += 1
     return {"total": total, "by_year": by_year, "by_path": by_path, "bac": bac, "source": "local-fallback"}
 
+@api_router.get("/analytics/cohorts")
+async def cohort_analytics():
+    await alumni_snapshot.sync()
+    return alumni_snapshot.cohorts()
+
+# Response compression
+class CompressionMiddleware:
+    """Negotiated brotli/gzip compression for buffered responses.
+
+    Only single-chunk bodies of at least `minimum_size` bytes are
+    compressed; streamed responses (e.g. the SSE feed) pass through
+    untouched so they are not held back by buffering.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    @staticmethod
+    def choose_encoding(accept_encoding: str) -> Optional[str]:
+        accepted = set()
+        for part in accept_encoding.split(","):
+            name, _, params = part.strip().partition(";")
+            q = params.strip()
+            if q.startswith("q="):
+                try:
+                    if float(q[2:]) <= 0:
+                        continue
+                except ValueError:
+                    continue
+            accepted.add(name.strip().lower())
+        if "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self.choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if not encoding:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if "content-encoding" in headers or headers.get("content-type", "").startswith("text/event-stream"):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                # Streaming or small: send uncompressed from here on
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+            if encoding == "br":
+                body = brotli.compress(body, quality=4)
+            else:
+                body = gzip.compress(body, compresslevel=6)
+            headers = MutableHeaders(raw=start_message["headers"])
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
+
 # Include the router in the main app
 app.include_router(api_router)
 
@@ -353,6 +1299,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware)
 
 # Configure logging
 logging.basicConfig(
@@ -363,8 +1310,36 @@ logger = logging.getLogger(__name__)
 
 @app.on_event("startup")
 async def on_startup():
+    await ensure_indexes()
     await ensure_admin_seed()
+    if MULTI_WORKER and WEB_CONCURRENCY == 1:
+        logger.warning(
+            "Running under a multi-process server without WEB_CONCURRENCY set; "
+            "RSVP streams use the Mongo feed, admission limits apply per worker"
+        )
+    if RSVP_CHANGE_STREAM:
+        app.state.rsvp_watcher = asyncio.create_task(watch_rsvp_changes())
+    elif MULTI_WORKER:
+        app.state.rsvp_watcher = asyncio.create_task(poll_rsvp_feed())
+    logger.info(
+        "Worker %d started (%s RSVP fan-out)",
+        os.getpid(),
+        "change stream" if RSVP_CHANGE_STREAM else "Mongo feed" if MULTI_WORKER else "in-process",
+    )
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    watcher = getattr(app.state, "rsvp_watcher", None)
+    if watcher:
+        watcher.cancel()
     client.close()
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(
+        "server:app",
+        host=os.environ.get("HOST", "0.0.0.0"),
+        port=int(os.environ.get("PORT", "8001")),
+        workers=WEB_CONCURRENCY,
+    )
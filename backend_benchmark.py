@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Read-scaling benchmark for the multi-worker deployment mode.
+Starts the backend with 1, 2, 4... uvicorn workers and measures read throughput
+Requires MONGO_URL and DB_NAME (same as backend/server.py)
+
+Paths are measured in two groups: "memory" paths are answered from worker
+memory (cohort analytics checks Mongo at most once a second per worker) and
+show how far the Python side scales; "mongo" paths query MongoDB on every
+request and are bounded by the database.
+
+Server workers are pinned to the first N CPUs and load-generating clients to
+the rest, so clients do not steal cycles from the workers being measured.
+With fewer than max(workers) + 1 CPUs (or MongoDB on the same cores) the
+numbers understate scaling; run mongod on another host for clean results.
+"""
+
+import argparse
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+BACKEND_DIR = Path(__file__).parent / "backend"
+PATH_GROUPS = {
+    "memory": ["/api/", "/api/analytics/cohorts"],
+    "mongo": ["/api/alumni?fields=full_name,graduation_year", "/api/events"],
+}
+
+
+def wait_ready(base_url: str, timeout: float = 30.0) -> bool:
+    """Poll the health endpoint until the server answers"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{base_url}/api/", timeout=1).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    return False
+
+
+def pin(cpus):
+    """Restrict the current process to `cpus` (Linux only)"""
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+
+
+def split_cpus(workers: int):
+    """Return (server_cpus, client_cpus); empty lists when pinning is unavailable"""
+    if not hasattr(os, "sched_getaffinity"):
+        return [], []
+    cpus = sorted(os.sched_getaffinity(0))
+    if len(cpus) <= workers:
+        return [], []
+    return cpus[:workers], cpus[workers:]
+
+
+def client_loop(base_url: str, paths, duration: float, counter, cpus):
+    """Issue reads back-to-back for `duration` seconds"""
+    pin(cpus)
+    session = requests.Session()
+    done = 0
+    deadline = time.time() + duration
+    while time.time() < deadline:
+        resp = session.get(base_url + paths[done % len(paths)], timeout=10)
+        if resp.status_code == 200:
+            done += 1
+    with counter.get_lock():
+        counter.value += done
+
+
+def measure(base_url: str, paths, clients: int, duration: float, cpus) -> float:
+    """Run `clients` load generators against `paths` and return requests/second"""
+    counter = multiprocessing.Value("i", 0)
+    procs = [
+        multiprocessing.Process(target=client_loop, args=(base_url, paths, duration, counter, cpus))
+        for _ in range(clients)
+    ]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    return counter.value / duration
+
+
+def run_level(workers: int, port: int, clients: int, duration: float) -> dict:
+    """Start the server with `workers` processes and return requests/second per path group"""
+    base_url = f"http://127.0.0.1:{port}"
+    env = {**os.environ, "WEB_CONCURRENCY": str(workers), "PORT": str(port), "HOST": "127.0.0.1"}
+    server_cpus, client_cpus = split_cpus(workers)
+    server = subprocess.Popen(
+        [sys.executable, "server.py"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        # uvicorn worker processes inherit the affinity
+        preexec_fn=lambda: pin(server_cpus),
+    )
+    try:
+        if not wait_ready(base_url):
+            raise RuntimeError(f"Server with {workers} worker(s) did not start")
+        # Warm every worker's caches before measuring
+        for _ in range(workers * 4):
+            for paths in PATH_GROUPS.values():
+                for path in paths:
+                    requests.get(base_url + path, timeout=10)
+        return {
+            group: measure(base_url, paths, clients, duration, client_cpus)
+            for group, paths in PATH_GROUPS.items()
+        }
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts")
+    parser.add_argument("--clients-per-worker", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8011)
+    args = parser.parse_args()
+
+    levels = [int(w) for w in args.workers.split(",")]
+    print(f"🚀 Read scaling benchmark ({os.cpu_count()} CPUs)")
+    print("=" * 60)
+    if not split_cpus(max(levels))[0]:
+        print(f"⚠️  Not enough CPUs to pin {max(levels)} worker(s) apart from the clients; "
+              "results will understate scaling")
+    baseline = {}
+    for workers in levels:
+        results = run_level(workers, args.port, workers * args.clients_per_worker, args.duration)
+        for group, rps in results.items():
+            baseline.setdefault(group, rps)
+            speedup = rps / baseline[group] if baseline[group] else 0.0
+            print(f"workers={workers:<3} {group:<7} req/s={rps:10.1f}  speedup={speedup:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,8 @@ Tests all backend endpoints according to test_result.md requirements
 import requests
 import json
 import sys
+import threading
+import time
 from typing import Dict, Any, Optional
 
 # Use the configured backend URL from frontend .env
@@ -278,6 +280,372 @@ class BackendTester:
             self.log_test("Invitations", False, f"Request failed: {str(e)}")
             return False
     
+    def test_events_batch(self, event_id: str):
+        """Test POST /api/events/batch keeps request order and reports missing ids"""
+        if not event_id:
+            self.log_test("Events Batch", False, "No event ID available")
+            return False
+        
+        try:
+            missing_id = "00000000-0000-0000-0000-000000000000"
+            response = requests.post(
+                f"{self.base_url}/events/batch",
+                json={"ids": [missing_id, event_id]},
+                timeout=10
+            )
+            
+            if response.status_code == 200:
+                data = response.json()
+                items = data.get("items", [])
+                if [e.get("id") for e in items] == [event_id] and data.get("missing") == [missing_id]:
+                    self.log_test("Events Batch", True, f"Found {len(items)} event(s), missing: {data['missing']}")
+                    return True
+                else:
+                    self.log_test("Events Batch", False, "Unexpected items or missing ids", data)
+                    return False
+            else:
+                self.log_test("Events Batch", False, f"Status: {response.status_code}", response.text)
+                return False
+                
+        except Exception as e:
+            self.log_test("Events Batch", False, f"Request failed: {str(e)}")
+            return False
+    
+    def test_rsvp_stream(self, event_id: str):
+        """Test the live RSVP stream and its short-lived ticket"""
+        if not self.auth_token or not event_id:
+            self.log_test("RSVP Stream", False, "No auth token or event ID available")
+            return False
+        
+        try:
+            # Stream without a ticket must be rejected
+            response = requests.get(f"{self.base_url}/events/{event_id}/rsvps/stream", timeout=10)
+            if response.status_code != 401:
+                self.log_test("RSVP Stream (No Ticket)", False, f"Expected 401, got: {response.status_code}", response.text)
+                return False
+            self.log_test("RSVP Stream (No Ticket)", True, "Rejected with 401")
+            
+            # Ticket for an unknown event
+            response = requests.post(
+                f"{self.base_url}/events/00000000-0000-0000-0000-000000000000/rsvps/stream-ticket",
+                headers=self.get_auth_headers(),
+                timeout=10
+            )
+            if response.status_code != 404:
+                self.log_test("RSVP Stream Ticket (Unknown Event)", False, f"Expected 404, got: {response.status_code}", response.text)
+                return False
+            self.log_test("RSVP Stream Ticket (Unknown Event)", True, "Rejected with 404")
+            
+            response = requests.post(
+                f"{self.base_url}/events/{event_id}/rsvps/stream-ticket",
+                headers=self.get_auth_headers(),
+                timeout=10
+            )
+            if response.status_code != 200 or "ticket" not in response.json():
+                self.log_test("RSVP Stream Ticket", False, f"Status: {response.status_code}", response.text)
+                return False
+            ticket = response.json()["ticket"]
+            self.log_test("RSVP Stream Ticket", True, f"Ticket expires in {response.json().get('expires_in')}s")
+            
+            # The ticket must not work as an admin session token
+            response = requests.get(
+                f"{self.base_url}/admin/limits",
+                headers={"Authorization": f"Bearer {ticket}"},
+                timeout=10
+            )
+            if response.status_code != 401:
+                self.log_test("RSVP Stream Ticket Scope", False, f"Expected 401, got: {response.status_code}", response.text)
+                return False
+            self.log_test("RSVP Stream Ticket Scope", True, "Ticket rejected as session token")
+            
+            with requests.get(
+                f"{self.base_url}/events/{event_id}/rsvps/stream",
+                params={"ticket": ticket},
+                stream=True,
+                timeout=10
+            ) as response:
+                content_type = response.headers.get("content-type", "")
+                first_line = next(response.iter_lines(decode_unicode=True), "")
+            if response.status_code == 200 and content_type.startswith("text/event-stream") and first_line.startswith("retry:"):
+                self.log_test("RSVP Stream", True, f"Stream opened, first line: {first_line}")
+                return True
+            else:
+                self.log_test("RSVP Stream", False, f"Status: {response.status_code}, type: {content_type}, first line: {first_line}")
+                return False
+                
+        except Exception as e:
+            self.log_test("RSVP Stream", False, f"Request failed: {str(e)}")
+            return False
+    
+    def test_invitation_rate_limit(self, event_id: str):
+        """Test 429 + Retry-After on the public invitation endpoint and GET /api/admin/limits"""
+        if not self.auth_token or not event_id:
+            self.log_test("Invitation Rate Limit", False, "No auth token or event ID available")
+            return False
+        
+        try:
+            # Fresh invitation so earlier tests do not affect its token budget
+            response = requests.post(
+                f"{self.base_url}/invitations",
+                json={"event_id": event_id},
+                headers=self.get_auth_headers(),
+                timeout=10
+            )
+            if response.status_code != 200:
+                self.log_test("Invitation Rate Limit", False, f"Invitation create status: {response.status_code}", response.text)
+                return False
+            token = response.json()["token"]
+            
+            rejected = None
+            for attempt in range(1, 41):
+                response = requests.get(f"{self.base_url}/invitations/{token}", timeout=10)
+                if response.status_code == 429:
+                    rejected = response
+                    break
+            if rejected is None:
+                self.log_test("Invitation Rate Limit", False, "No 429 after 40 requests")
+                return False
+            retry_after = rejected.headers.get("Retry-After", "")
+            if not retry_after.isdigit() or int(retry_after) < 1:
+                self.log_test("Invitation Rate Limit", False, f"Bad Retry-After: {retry_after!r}", rejected.text)
+                return False
+            self.log_test("Invitation Rate Limit", True, f"429 after {attempt} requests, Retry-After: {retry_after}")
+            
+            response = requests.get(f"{self.base_url}/admin/limits", headers=self.get_auth_headers(), timeout=10)
+            if response.status_code != 200:
+                self.log_test("Admission Stats", False, f"Status: {response.status_code}", response.text)
+                return False
+            data = response.json()
+            required_keys = ["max_concurrency", "in_flight", "admitted", "rejected", "tracked_ips", "tracked_tokens"]
+            limiter = data.get("invitation_get", {})
+            missing_keys = [key for key in required_keys if key not in limiter]
+            if "invitation_rsvp" not in data or "worker_pid" not in data or missing_keys:
+                self.log_test("Admission Stats", False, f"Missing limiters or keys: {missing_keys}", data)
+                return False
+            if limiter["rejected"].get("token_rate", 0) + limiter["rejected"].get("ip_rate", 0) < 1:
+                self.log_test("Admission Stats", False, "Rejection not counted", data)
+                return False
+            self.log_test("Admission Stats", True, f"invitation_get rejected: {limiter['rejected']}")
+            return True
+                
+        except Exception as e:
+            self.log_test("Invitation Rate Limit", False, f"Request failed: {str(e)}")
+            return False
+    
+    def test_alumni_batch(self):
+        """Test POST /api/alumni/batch order, duplicate collapsing and the id limit"""
+        try:
+            response = requests.get(f"{self.base_url}/alumni", timeout=10)
+            alumni_ids = [a["id"] for a in response.json()][:2] if response.status_code == 200 else []
+            if len(alumni_ids) < 2 and self.auth_token:
+                # Need two alumni to check ordering
+                response = requests.post(
+                    f"{self.base_url}/alumni",
+                    json={"full_name": "Ion Ionescu", "graduation_year": 2019, "bacalaureat_passed": True, "path": "faculty"},
+                    headers=self.get_auth_headers(),
+                    timeout=10
+                )
+                if response.status_code == 200:
+                    alumni_ids.append(response.json()["id"])
+            if len(alumni_ids) < 2:
+                self.log_test("Alumni Batch", False, "Need at least two alumni")
+                return False
+            
+            # Reverse list order, with a miss and duplicates mixed in
+            missing_id = "00000000-0000-0000-0000-000000000000"
+            wanted = alumni_ids[::-1]
+            request_ids = [wanted[0], missing_id, *wanted, wanted[0], missing_id]
+            response = requests.post(f"{self.base_url}/alumni/batch", json={"ids": request_ids}, timeout=10)
+            if response.status_code != 200:
+                self.log_test("Alumni Batch", False, f"Status: {response.status_code}", response.text)
+                return False
+            data = response.json()
+            if [a.get("id") for a in data.get("items", [])] != wanted or data.get("missing") != [missing_id]:
+                self.log_test("Alumni Batch", False, f"Expected items {wanted} and missing [{missing_id}]", data)
+                return False
+            self.log_test("Alumni Batch", True, f"Duplicates collapsed, order kept for {len(wanted)} alumni")
+            
+            # Server default BATCH_MAX_IDS is 100
+            too_many = [f"id-{i}" for i in range(101)]
+            response = requests.post(f"{self.base_url}/alumni/batch", json={"ids": too_many}, timeout=10)
+            if response.status_code == 422:
+                self.log_test("Alumni Batch (Too Many Ids)", True, "Rejected with 422")
+                return True
+            else:
+                self.log_test("Alumni Batch (Too Many Ids)", False, f"Expected 422, got: {response.status_code}", response.text)
+                return False
+                
+        except Exception as e:
+            self.log_test("Alumni Batch", False, f"Request failed: {str(e)}")
+            return False
+    
+    def test_cohort_analytics(self):
+        """Test GET /api/analytics/cohorts follows alumni create, update and delete"""
+        if not self.auth_token:
+            self.log_test("Cohort Analytics", False, "No auth token available")
+            return False
+        
+        def cohorts():
+            response = requests.get(f"{self.base_url}/analytics/cohorts", timeout=10)
+            if response.status_code != 200:
+                raise AssertionError(f"Cohorts status: {response.status_code} {response.text}")
+            return response.json()
+        
+        def cell(data, year, path):
+            return data.get("by_year_path", {}).get(year, {}).get(path, 0)
+        
+        # A year no real alumni use, so deltas are unambiguous
+        year = "1901"
+        alumni_id = None
+        try:
+            before = cohorts()
+            alumni_data = {
+                "full_name": "Test Cohorta",
+                "graduation_year": int(year),
+                "bacalaureat_passed": True,
+                "path": "faculty"
+            }
+            response = requests.post(f"{self.base_url}/alumni", json=alumni_data, headers=self.get_auth_headers(), timeout=10)
+            if response.status_code != 200:
+                self.log_test("Cohort Analytics (Create)", False, f"Status: {response.status_code}", response.text)
+                return False
+            alumni_id = response.json()["id"]
+            after_create = cohorts()
+            if (after_create["total"] != before["total"] + 1
+                    or cell(after_create, year, "faculty") != cell(before, year, "faculty") + 1):
+                self.log_test("Cohort Analytics (Create)", False, "Counts did not follow create", after_create)
+                return False
+            self.log_test("Cohort Analytics (Create)", True, f"Total: {after_create['total']}")
+            
+            alumni_data.update({"path": "employed", "bacalaureat_passed": False})
+            response = requests.put(f"{self.base_url}/alumni/{alumni_id}", json=alumni_data, headers=self.get_auth_headers(), timeout=10)
+            if response.status_code != 200:
+                self.log_test("Cohort Analytics (Update)", False, f"Status: {response.status_code}", response.text)
+                return False
+            after_update = cohorts()
+            if (after_update["total"] != after_create["total"]
+                    or cell(after_update, year, "faculty") != cell(before, year, "faculty")
+                    or cell(after_update, year, "employed") != cell(before, year, "employed") + 1
+                    or after_update["bac_pass_rate"].get(year) != 0.0):
+                self.log_test("Cohort Analytics (Update)", False, "Counts did not follow update", after_update)
+                return False
+            self.log_test("Cohort Analytics (Update)", True, f"{year} moved to employed, pass rate 0.0")
+            
+            response = requests.delete(f"{self.base_url}/alumni/{alumni_id}", headers=self.get_auth_headers(), timeout=10)
+            alumni_id = None
+            after_delete = cohorts()
+            if after_delete["total"] != before["total"] or cell(after_delete, year, "employed") != cell(before, year, "employed"):
+                self.log_test("Cohort Analytics (Delete)", False, "Counts did not follow delete", after_delete)
+                return False
+            self.log_test("Cohort Analytics (Delete)", True, f"Total back to {after_delete['total']}")
+            
+            # Out-of-range years are rejected before they reach the snapshot
+            alumni_data["graduation_year"] = 200000000
+            response = requests.post(f"{self.base_url}/alumni", json=alumni_data, headers=self.get_auth_headers(), timeout=10)
+            if response.status_code == 422:
+                self.log_test("Alumni Year Validation", True, "Rejected with 422")
+                return True
+            else:
+                self.log_test("Alumni Year Validation", False, f"Expected 422, got: {response.status_code}", response.text)
+                return False
+                
+        except Exception as e:
+            self.log_test("Cohort Analytics", False, f"Request failed: {str(e)}")
+            return False
+        finally:
+            if alumni_id:
+                requests.delete(f"{self.base_url}/alumni/{alumni_id}", headers=self.get_auth_headers(), timeout=10)
+    
+    def test_fields_and_compression(self):
+        """Test fields= projection on list endpoints and negotiated compression"""
+        try:
+            response = requests.get(f"{self.base_url}/alumni", params={"fields": "full_name,graduation_year"}, timeout=10)
+            if response.status_code != 200:
+                self.log_test("Alumni Fields Projection", False, f"Status: {response.status_code}", response.text)
+                return False
+            rows = response.json()
+            unexpected = [r for r in rows if set(r) != {"id", "full_name", "graduation_year"}]
+            if not rows or unexpected:
+                self.log_test("Alumni Fields Projection", False, "Rows missing or carrying extra fields", unexpected[:3] or rows)
+                return False
+            self.log_test("Alumni Fields Projection", True, f"{len(rows)} rows with id, full_name, graduation_year only")
+            
+            response = requests.get(f"{self.base_url}/events", params={"fields": "title,nope"}, timeout=10)
+            if response.status_code != 400 or "nope" not in response.json().get("detail", ""):
+                self.log_test("Fields Projection (Unknown Field)", False, f"Expected 400, got: {response.status_code}", response.text)
+                return False
+            self.log_test("Fields Projection (Unknown Field)", True, f"400: {response.json()['detail']}")
+            
+            # The OpenAPI document is well above the compression threshold
+            root_url = self.base_url.rsplit("/api", 1)[0]
+            response = requests.get(f"{root_url}/openapi.json", headers={"Accept-Encoding": "gzip"}, timeout=10)
+            encoding = response.headers.get("Content-Encoding")
+            vary = response.headers.get("Vary", "")
+            if response.status_code == 200 and encoding == "gzip" and "accept-encoding" in vary.lower() and response.json().get("paths"):
+                self.log_test("Response Compression", True, f"Content-Encoding: {encoding}, Vary: {vary}")
+                return True
+            else:
+                self.log_test("Response Compression", False, f"Status: {response.status_code}, Content-Encoding: {encoding}, Vary: {vary}")
+                return False
+                
+        except Exception as e:
+            self.log_test("Fields And Compression", False, f"Request failed: {str(e)}")
+            return False
+    
+    def test_rsvp_stream_delivery(self, event_id: str):
+        """Test that an RSVP reaches an open stream (possibly served by another worker)"""
+        if not self.auth_token or not event_id:
+            self.log_test("RSVP Stream Delivery", False, "No auth token or event ID available")
+            return False
+        
+        try:
+            response = requests.post(
+                f"{self.base_url}/invitations",
+                json={"event_id": event_id},
+                headers=self.get_auth_headers(),
+                timeout=10
+            )
+            invitation = response.json()
+            ticket = requests.post(
+                f"{self.base_url}/events/{event_id}/rsvps/stream-ticket",
+                headers=self.get_auth_headers(),
+                timeout=10
+            ).json()["ticket"]
+            
+            received = []
+            opened = threading.Event()
+            
+            def read_stream():
+                with requests.get(
+                    f"{self.base_url}/events/{event_id}/rsvps/stream",
+                    params={"ticket": ticket},
+                    stream=True,
+                    timeout=15
+                ) as stream:
+                    for line in stream.iter_lines(decode_unicode=True):
+                        opened.set()
+                        if line.startswith("data:"):
+                            received.append(json.loads(line[5:]))
+                            return
+            
+            reader = threading.Thread(target=read_stream, daemon=True)
+            reader.start()
+            opened.wait(10)
+            time.sleep(0.5)
+            requests.post(f"{self.base_url}/invitations/{invitation['token']}/rsvp", json={"status": "yes"}, timeout=10)
+            reader.join(10)
+            
+            if received and received[0].get("invitation_id") == invitation["id"] and received[0].get("rsvp_status") == "yes":
+                self.log_test("RSVP Stream Delivery", True, f"Received RSVP for invitation {invitation['id'][:8]}...")
+                return True
+            else:
+                self.log_test("RSVP Stream Delivery", False, "RSVP not received on stream", received)
+                return False
+                
+        except Exception as e:
+            self.log_test("RSVP Stream Delivery", False, f"Request failed: {str(e)}")
+            return False
+    
     def test_csharp_alumni_metrics(self):
         """Test C# proxy alumni metrics endpoint with local fallback"""
         try:
@@ -371,12 +739,33 @@ class BackendTester:
         # Test 5: Invitations
         invitations_ok = self.test_invitations(event_id) if event_id else False
         
-        # Test 6: C# Alumni Metrics (with local fallback)
+        # Test 6: Events batch fetch
+        events_batch_ok = self.test_events_batch(event_id) if event_id else False
+        
+        # Test 7: C# Alumni Metrics (with local fallback)
         csharp_metrics_ok = self.test_csharp_alumni_metrics()
         
-        # Test 7: C# Render Invitation (should return 503)
+        # Test 8: C# Render Invitation (should return 503)
         csharp_render_ok = self.test_csharp_render_invitation(event_id) if event_id else False
         
+        # Test 9: Live RSVP stream
+        rsvp_stream_ok = self.test_rsvp_stream(event_id) if event_id else False
+        
+        # Test 10: Admission control on public invitation endpoints
+        rate_limit_ok = self.test_invitation_rate_limit(event_id) if event_id else False
+        
+        # Test 11: Alumni batch fetch
+        alumni_batch_ok = self.test_alumni_batch()
+        
+        # Test 12: Cohort analytics
+        cohorts_ok = self.test_cohort_analytics()
+        
+        # Test 13: Sparse fields and response compression
+        fields_ok = self.test_fields_and_compression()
+        
+        # Test 14: RSVP delivery over the live stream
+        rsvp_delivery_ok = self.test_rsvp_stream_delivery(event_id) if event_id else False
+        
         # Summary
         print("=" * 60)
         print("📊 TEST SUMMARY")